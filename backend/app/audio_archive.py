@@ -0,0 +1,433 @@
+"""Arquivamento de áudios frios: empacota chunks antigos em um bundle por lead.
+
+Estrutura em disco (por lead, sob `settings.audio_dir` = DATA_DIR/audio):
+    {audio_dir}/{email}/archive.zip          # bundle com os chunks antigos
+    {audio_dir}/{email}/archive.index.json   # índice: caminho -> offset/tamanho
+
+Cada chunk é gravado como membro independente do ZIP (formatos já comprimidos
+ficam em STORED, PCM/WAV em DEFLATED), então qualquer chunk pode ser lido com
+um único seek + read, sem descompactar o bundle.
+
+Vários workers podem rodar o arquivador: cada lead é processado sob um lock
+exclusivo (flock em {audio_dir}/{email}/.archive.lock).
+
+Referência: https://docs.python.org/3/library/zipfile.html
+"""
+import argparse
+import asyncio
+import json
+import os
+import struct
+import time
+import uuid
+import zipfile
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+BUNDLE_NAME = "archive.zip"
+INDEX_NAME = "archive.index.json"
+LOCK_NAME = ".archive.lock"
+SPEAKER_SUBFOLDERS = ("user_audio", "agent_audio")
+
+# Formatos já comprimidos: recomprimir só gasta CPU
+STORED_FORMATS = {".mp3", ".webm", ".ogg", ".m4a"}
+
+# Local file header do ZIP: assinatura + campos fixos (30 bytes)
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+def _load_index(lead_dir: Path) -> Dict[str, dict]:
+    index_path = lead_dir / INDEX_NAME
+    if not index_path.exists():
+        return {}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_index(lead_dir: Path, index: Dict[str, dict]) -> None:
+    """Grava o índice de forma atômica (tmp + rename)."""
+    index_path = lead_dir / INDEX_NAME
+    tmp_path = lead_dir / f".{INDEX_NAME}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index_path)
+
+
+def _data_offset(fp, header_offset: int) -> int:
+    """Calcula o offset dos dados de um membro a partir do seu local header."""
+    fp.seek(header_offset)
+    header = _LOCAL_HEADER.unpack(fp.read(_LOCAL_HEADER.size))
+    if header[0] != _LOCAL_HEADER_SIGNATURE:
+        raise ValueError(f"Local header inválido no offset {header_offset}")
+    name_len, extra_len = header[9], header[10]
+    return header_offset + _LOCAL_HEADER.size + name_len + extra_len
+
+
+def _disk_usage(path: Path) -> int:
+    """Bytes realmente ocupados em disco (blocos alocados)."""
+    st = path.stat()
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+def _fsync_path(path: Path) -> None:
+    """fsync de arquivo ou diretório (diretórios: POSIX; no Windows é ignorado)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _recover_bundle(bundle_path: Path) -> int:
+    """
+    Reconstrói o diretório central de um bundle cujo append foi interrompido.
+
+    O modo "a" do zipfile grava os membros novos por cima do diretório central
+    antigo; se o processo cai no meio, o arquivo deixa de ser um ZIP válido.
+    Percorre os local headers desde o início, mantém os membros completos (dados
+    inteiros e CRC conferido), trunca o resto e grava um diretório central novo.
+
+    Returns:
+        Quantidade de membros recuperados.
+    """
+    infos = []
+    with open(bundle_path, "r+b") as fp:
+        file_size = fp.seek(0, os.SEEK_END)
+        offset = 0
+        while offset + _LOCAL_HEADER.size <= file_size:
+            fp.seek(offset)
+            header = _LOCAL_HEADER.unpack(fp.read(_LOCAL_HEADER.size))
+            (signature, version, flags, method, dos_time, dos_date,
+             crc, compressed_size, size, name_len, extra_len) = header
+            # Bit 3: tamanhos num data descriptor (nunca usado em arquivos seekable)
+            if signature != _LOCAL_HEADER_SIGNATURE or flags & 0x08:
+                break
+            data_start = offset + _LOCAL_HEADER.size + name_len + extra_len
+            if data_start + compressed_size > file_size:
+                break
+            name = fp.read(name_len).decode("utf-8" if flags & 0x800 else "cp437")
+            fp.seek(data_start)
+            data = fp.read(compressed_size)
+            try:
+                if method == zipfile.ZIP_DEFLATED:
+                    data = zlib.decompress(data, -zlib.MAX_WBITS)
+            except zlib.error:
+                break
+            if zlib.crc32(data) != crc or len(data) != size:
+                break
+            info = zipfile.ZipInfo(name, date_time=(
+                (dos_date >> 9) + 1980, (dos_date >> 5) & 0xF, dos_date & 0x1F,
+                dos_time >> 11, (dos_time >> 5) & 0x3F, (dos_time & 0x1F) * 2,
+            ))
+            info.compress_type = method
+            info.flag_bits = flags
+            info.extract_version = version
+            info.CRC = crc
+            info.compress_size = compressed_size
+            info.file_size = size
+            info.header_offset = offset
+            infos.append(info)
+            offset = data_start + compressed_size
+        fp.truncate(offset)
+
+    # Sem diretório central, o modo "a" posiciona no fim do arquivo; registrando
+    # os membros encontrados, o close() grava o diretório central completo
+    with zipfile.ZipFile(bundle_path, "a") as zf:
+        for info in infos:
+            zf.filelist.append(info)
+            zf.NameToInfo[info.filename] = info
+    _fsync_path(bundle_path)
+    return len(infos)
+
+
+@contextmanager
+def _lead_lock(lead_dir: Path):
+    """
+    Lock exclusivo por lead (flock em .archive.lock), compartilhado entre processos.
+
+    Não bloqueia: se outro worker já está arquivando o lead, retorna False e o
+    chamador pula o lead nesta rodada.
+    """
+    if fcntl is None:  # Windows: sem flock, roda sem lock (um único processo)
+        yield True
+        return
+    with open(lead_dir / LOCK_NAME, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _unique_arcname(arcname: str, members: Dict[str, zipfile.ZipInfo], crc: int, size: int) -> str:
+    """
+    Nome no bundle para um chunk cujo nome já foi usado com outro conteúdo.
+
+    Reaproveita `{stem}_N{ext}` se já contém exatamente este conteúdo (rodada
+    anterior interrompida antes de remover o arquivo); senão, o primeiro livre.
+    """
+    stem, dot, ext = arcname.rpartition(".")
+    if not dot:
+        stem, ext = arcname, ""
+    attempt = 1
+    while True:
+        candidate = f"{stem}_{attempt}.{ext}" if dot else f"{stem}_{attempt}"
+        member = members.get(candidate)
+        if member is None or (member.CRC == crc and member.file_size == size):
+            return candidate
+        attempt += 1
+
+
+def archive_lead(lead_dir: Path, older_than_days: float) -> dict:
+    """
+    Empacota os chunks de um lead mais antigos que `older_than_days` no bundle.
+
+    Roda sob lock exclusivo por lead. Um arquivo só é removido depois que o
+    bundle e o índice foram gravados, e só se o membro do bundle tem o mesmo
+    tamanho e CRC do arquivo em disco; se o nome já existe no bundle com outro
+    conteúdo, o chunk é arquivado com sufixo único. Bundle e diretório passam
+    por fsync antes dos unlinks. Se o processo cair no meio, a próxima execução
+    reconstrói o diretório central (append interrompido) e o índice.
+    """
+    report = {"files": 0, "bytes_in": 0, "disk_freed": 0, "bundle_growth": 0}
+    with _lead_lock(lead_dir) as acquired:
+        if not acquired:
+            return report
+        return _archive_lead_locked(lead_dir, older_than_days, report)
+
+
+def _archive_lead_locked(lead_dir: Path, older_than_days: float, report: dict) -> dict:
+    cutoff = time.time() - older_than_days * 86400
+    bundle_path = lead_dir / BUNDLE_NAME
+    index = _load_index(lead_dir)
+
+    members: Dict[str, zipfile.ZipInfo] = {}
+    if bundle_path.exists():
+        try:
+            with zipfile.ZipFile(bundle_path, "r") as zf:
+                members = {info.filename: info for info in zf.infolist()}
+        except zipfile.BadZipFile:
+            recovered = _recover_bundle(bundle_path)
+            print(f"[ARCHIVE] Bundle {bundle_path} recuperado após append interrompido: {recovered} membros")
+            with zipfile.ZipFile(bundle_path, "r") as zf:
+                members = {info.filename: info for info in zf.infolist()}
+            # Entradas do índice sem membro correspondente não são mais válidas
+            index = {name: entry for name, entry in index.items() if name in members}
+
+    candidates = []
+    for subfolder in SPEAKER_SUBFOLDERS:
+        folder = lead_dir / subfolder
+        if not folder.is_dir():
+            continue
+        for path in sorted(folder.iterdir()):
+            # Ignora temporários de escrita em andamento (.{nome}.tmp)
+            if path.name.startswith(".") or not path.is_file():
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if st.st_mtime >= cutoff:
+                continue
+            candidates.append((path, f"{subfolder}/{path.name}"))
+
+    if not candidates and set(members).issubset(index):
+        return report
+
+    bundle_size_before = _disk_usage(bundle_path) if bundle_path.exists() else 0
+    # (arquivo, stat lido, CRC, tamanho): só removidos se continuarem iguais
+    archived = []
+    with zipfile.ZipFile(bundle_path, "a") as zf:
+        for path, arcname in candidates:
+            try:
+                st = path.stat()
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            crc = zlib.crc32(data)
+            member = members.get(arcname)
+            if member is not None and (member.CRC != crc or member.file_size != len(data)):
+                # Mesmo nome, conteúdo diferente: nunca descartar o chunk novo
+                arcname = _unique_arcname(arcname, members, crc, len(data))
+                member = members.get(arcname)
+            if member is None:
+                compress_type = (
+                    zipfile.ZIP_STORED
+                    if path.suffix.lower() in STORED_FORMATS
+                    else zipfile.ZIP_DEFLATED
+                )
+                info = zipfile.ZipInfo(arcname, date_time=time.localtime(st.st_mtime)[:6])
+                info.compress_type = compress_type
+                zf.writestr(info, data)
+                members[arcname] = zf.getinfo(arcname)
+            archived.append((path, st, crc, len(data)))
+    # Bundle em disco antes de qualquer unlink: sem isso, após uma queda de
+    # energia os unlinks podem persistir e os dados anexados ao ZIP não
+    _fsync_path(bundle_path)
+
+    with zipfile.ZipFile(bundle_path, "r") as zf, open(bundle_path, "rb") as fp:
+        for info in zf.infolist():
+            if info.filename in index:
+                continue
+            index[info.filename] = {
+                "offset": _data_offset(fp, info.header_offset),
+                "compressed_size": info.compress_size,
+                "size": info.file_size,
+                "compress_type": info.compress_type,
+                "crc": info.CRC,
+            }
+    _write_index(lead_dir, index)
+    _fsync_path(lead_dir)
+
+    for path, st, crc, size in archived:
+        try:
+            current = path.stat()
+            # Reescrito depois da leitura: fica solto para a próxima rodada
+            if (current.st_mtime_ns, current.st_size) != (st.st_mtime_ns, st.st_size):
+                continue
+            disk = _disk_usage(path)
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        report["files"] += 1
+        report["bytes_in"] += size
+        report["disk_freed"] += disk
+
+    report["bundle_growth"] = _disk_usage(bundle_path) - bundle_size_before
+    return report
+
+
+def archive_all(audio_dir: Optional[Path] = None, older_than_days: float = 7) -> dict:
+    """Arquiva todos os leads sob `audio_dir` (padrão: `settings.audio_dir`) e retorna um relatório agregado."""
+    audio_dir = audio_dir or settings.audio_dir
+    started = time.perf_counter()
+    totals = {"leads": 0, "files": 0, "bytes_in": 0, "disk_freed": 0, "bundle_growth": 0, "errors": 0}
+    if audio_dir.is_dir():
+        for lead_dir in sorted(audio_dir.iterdir()):
+            if not lead_dir.is_dir():
+                continue
+            try:
+                report = archive_lead(lead_dir, older_than_days)
+            except Exception as e:
+                print(f"[ARCHIVE] Erro ao arquivar {lead_dir}: {e}")
+                totals["errors"] += 1
+                continue
+            if report["files"]:
+                totals["leads"] += 1
+            for key in ("files", "bytes_in", "disk_freed", "bundle_growth"):
+                totals[key] += report[key]
+
+    elapsed = time.perf_counter() - started
+    totals["reclaimed_bytes"] = totals["disk_freed"] - totals["bundle_growth"]
+    totals["elapsed_seconds"] = round(elapsed, 3)
+    totals["files_per_second"] = round(totals["files"] / elapsed, 1) if elapsed > 0 else 0.0
+    totals["mb_per_second"] = round(totals["bytes_in"] / 1e6 / elapsed, 2) if elapsed > 0 else 0.0
+    return totals
+
+
+@lru_cache(maxsize=256)
+def _index_names(lead_dir: Path, version: tuple) -> Dict[str, frozenset]:
+    """Nomes do índice agrupados por subpasta; `version` (stat do índice) invalida o cache."""
+    names: Dict[str, set] = {}
+    for relpath in _load_index(lead_dir):
+        subfolder, _, name = relpath.partition("/")
+        names.setdefault(subfolder, set()).add(name)
+    return {subfolder: frozenset(group) for subfolder, group in names.items()}
+
+
+def archived_names(audio_subdir: Path) -> frozenset:
+    """
+    Nomes já arquivados no bundle para uma subpasta (ex.: .../user_audio).
+
+    O índice só é relido quando muda: o cache é chaveado pelo inode, mtime e
+    tamanho do arquivo, e todo _write_index troca o inode (tmp + rename).
+    """
+    lead_dir = audio_subdir.parent
+    try:
+        st = os.stat(lead_dir / INDEX_NAME)
+    except FileNotFoundError:
+        return frozenset()
+    version = (st.st_ino, st.st_mtime_ns, st.st_size)
+    return _index_names(lead_dir, version).get(audio_subdir.name, frozenset())
+
+
+def read_chunk(lead_dir: Path, relpath: str) -> Optional[bytes]:
+    """
+    Lê um chunk de áudio, esteja ele solto no disco ou dentro do bundle.
+
+    Args:
+        lead_dir: Diretório do lead (data/audio/{email})
+        relpath: Caminho relativo, ex.: "agent_audio/2024-01-01_10-00-00_agent_3.mp3"
+
+    Returns:
+        Os bytes originais do chunk, ou None se não existir.
+    """
+    loose = lead_dir / relpath
+    if loose.is_file():
+        return loose.read_bytes()
+
+    entry = _load_index(lead_dir).get(relpath)
+    if entry is None:
+        return None
+
+    with open(lead_dir / BUNDLE_NAME, "rb") as fp:
+        fp.seek(entry["offset"])
+        data = fp.read(entry["compressed_size"])
+    if entry["compress_type"] == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -zlib.MAX_WBITS)
+    if zlib.crc32(data) != entry["crc"]:
+        raise ValueError(f"CRC inválido para {relpath} em {lead_dir / BUNDLE_NAME}")
+    return data
+
+
+def format_report(report: dict) -> str:
+    return (
+        f"{report['files']} arquivos de {report['leads']} leads, "
+        f"{report['bytes_in'] / 1e6:.2f} MB lidos, "
+        f"{report['reclaimed_bytes'] / 1e6:.2f} MB recuperados em disco, "
+        f"{report['elapsed_seconds']}s "
+        f"({report['files_per_second']} arquivos/s, {report['mb_per_second']} MB/s)"
+    )
+
+
+async def run_archiver(interval_seconds: int, older_than_days: float, audio_dir: Optional[Path] = None) -> None:
+    """Loop em background: arquiva periodicamente sem bloquear o event loop."""
+    while True:
+        try:
+            report = await asyncio.to_thread(archive_all, audio_dir, older_than_days)
+            if report["files"]:
+                print(f"[ARCHIVE] {format_report(report)}")
+        except Exception as e:
+            print(f"[ARCHIVE] Erro no arquivamento: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Empacota áudios antigos em bundles por lead.")
+    parser.add_argument("--days", type=float, default=settings.audio_archive_after_days, help="Idade mínima (dias) para arquivar")
+    parser.add_argument("--audio-dir", type=Path, default=settings.audio_dir, help="Raiz dos áudios (padrão: DATA_DIR/audio)")
+    args = parser.parse_args()
+    print(f"[ARCHIVE] {format_report(archive_all(args.audio_dir, args.days))}")
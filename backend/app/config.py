@@ -17,12 +17,34 @@ class Settings(BaseSettings):
     database_url: Optional[str] = Field(None, alias="DATABASE_URL")
     elevenlabs_agent_id: Optional[str] = Field(None, alias="ELEVENLABS_AGENT_ID")
     cors_origins: Optional[str] = Field(default="http://localhost:3000", alias="CORS_ORIGINS")
+    data_dir: Path = Field(default=Path("data"), alias="DATA_DIR")
+    max_decompressed_body_bytes: int = Field(default=50 * 1024 * 1024, alias="MAX_DECOMPRESSED_BODY_BYTES")
+    health_probe_interval_seconds: int = Field(default=15, alias="HEALTH_PROBE_INTERVAL_SECONDS")
+    health_probe_timeout_seconds: float = Field(default=5.0, alias="HEALTH_PROBE_TIMEOUT_SECONDS")
+    audio_archive_enabled: bool = Field(default=False, alias="AUDIO_ARCHIVE_ENABLED")
+    audio_archive_after_days: int = Field(default=7, alias="AUDIO_ARCHIVE_AFTER_DAYS")
+    audio_archive_interval_seconds: int = Field(default=3600, alias="AUDIO_ARCHIVE_INTERVAL_SECONDS")
     
     @property
     def agent_id_value(self) -> str:
         """Retorna o agent_id, tentando primeiro AGENT_ID e depois ELEVENLABS_AGENT_ID."""
         return self.agent_id or self.elevenlabs_agent_id or ""
     
+    @property
+    def transcripts_dir(self) -> Path:
+        """Diretório das transcrições STT (por lead)."""
+        return self.data_dir / "transcripts"
+    
+    @property
+    def audio_dir(self) -> Path:
+        """Diretório dos áudios (por lead, user_audio/ e agent_audio/)."""
+        return self.data_dir / "audio"
+    
+    @property
+    def debug_logs_dir(self) -> Path:
+        """Diretório dos logs de console do navegador."""
+        return self.data_dir / "debug" / "browser_logs"
+    
     @property
     def cors_origins_list(self) -> List[str]:
         """Retorna CORS_ORIGINS como lista."""
@@ -5,6 +5,8 @@ import asyncpg
 from app.config import settings
 
 _pool: Optional[asyncpg.Pool] = None
+# Criação do pool em andamento, compartilhada por todos que chamam get_pool()
+_pool_task: Optional[asyncio.Task] = None
 
 RETRY_DELAYS = [2, 4, 6]
 CONNECTION_TIMEOUT = 30
@@ -12,6 +14,32 @@ CONNECTION_TIMEOUT = 30
 
 async def get_pool() -> asyncpg.Pool:
     """Retorna o pool de conexões. Cria com retry e inicializa a tabela se necessário."""
+    if _pool is not None:
+        return _pool
+    return await asyncio.shield(start_pool_creation())
+
+
+def get_existing_pool() -> Optional[asyncpg.Pool]:
+    """Retorna o pool se já foi criado, sem disparar a criação."""
+    return _pool
+
+
+def start_pool_creation() -> asyncio.Task:
+    """
+    Inicia a criação do pool ou reaproveita a que está em andamento.
+
+    Requests concorrentes (e o health monitor) esperam a mesma tentativa, em vez
+    de cada um rodar a sua cadeia de retry ou ficar na fila de um lock.
+    """
+    global _pool_task
+    if _pool_task is None or _pool_task.done():
+        _pool_task = asyncio.create_task(_create_pool())
+        # Evita "Task exception was never retrieved" se ninguém mais esperar a task
+        _pool_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+    return _pool_task
+
+
+async def _create_pool() -> asyncpg.Pool:
     global _pool
     if _pool is None:
         if not settings.database_url:
@@ -67,9 +95,28 @@ async def _init_leads_table() -> None:
         """)
 
 
+def pool_stats() -> Optional[dict]:
+    """Utilização do pool sem criá-lo (None se o pool ainda não existe)."""
+    pool = _pool
+    if pool is None:
+        return None
+    size = pool.get_size()
+    idle = pool.get_idle_size()
+    max_size = pool.get_max_size()
+    return {
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "max_size": max_size,
+        "utilization": round((size - idle) / max_size, 2) if max_size else 0.0,
+    }
+
+
 async def close_pool() -> None:
     """Fecha o pool de conexões."""
     global _pool
+    if _pool_task is not None and not _pool_task.done():
+        _pool_task.cancel()
     if _pool is not None:
         await _pool.close()
         _pool = None
@@ -0,0 +1,175 @@
+"""Monitor de saúde em background: checa DB e ElevenLabs em intervalo e guarda o resultado.
+
+Cada checagem roda no seu próprio loop, limitada por HEALTH_PROBE_TIMEOUT_SECONDS,
+e atualiza a sua entrada no cache de forma independente: um DB fora do ar
+(criação do pool em retry) não atrasa a checagem da ElevenLabs nem o cache.
+Os endpoints de liveness/readiness respondem a partir deste cache em tempo
+constante, sem pegar conexão do pool nem disparar a criação do pool.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+from app.database import get_existing_pool, pool_stats, start_pool_creation
+
+ELEVENLABS_PROBE_URL = "https://api.elevenlabs.io/v1/models"
+CHECKS = ("database", "elevenlabs")
+
+
+def _unchecked() -> dict:
+    return {
+        "ok": False,
+        "latency_ms": None,
+        "detail": "ainda não verificado",
+        "checked_at": None,
+        "checked_monotonic": None,
+        "down_since": None,
+    }
+
+
+_state = {
+    "checks": {name: _unchecked() for name in CHECKS},
+    "degraded_since": None,
+}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _probe_database() -> dict:
+    if not settings.database_url:
+        return {"ok": False, "latency_ms": None, "detail": "DATABASE_URL não configurado"}
+    timeout = settings.health_probe_timeout_seconds
+    started = time.perf_counter()
+    try:
+        pool = get_existing_pool()
+        if pool is None:
+            # Dispara (ou acompanha) a criação do pool sem ficar preso à cadeia de
+            # retry: shield mantém a criação rodando quando o probe estoura o timeout
+            try:
+                pool = await asyncio.wait_for(asyncio.shield(start_pool_creation()), timeout)
+            except asyncio.TimeoutError:
+                return {
+                    "ok": False,
+                    "latency_ms": _elapsed_ms(started),
+                    "detail": f"pool ainda conectando ao banco (> {timeout}s)",
+                }
+        async with pool.acquire(timeout=timeout) as conn:
+            await conn.fetchval("SELECT 1", timeout=timeout)
+        return {"ok": True, "latency_ms": _elapsed_ms(started), "detail": None}
+    except Exception as e:
+        return {"ok": False, "latency_ms": _elapsed_ms(started), "detail": str(e) or type(e).__name__}
+
+
+def _elevenlabs_probe(client: httpx.AsyncClient) -> Callable[[], Awaitable[dict]]:
+    async def probe() -> dict:
+        started = time.perf_counter()
+        try:
+            response = await client.get(
+                ELEVENLABS_PROBE_URL,
+                headers={"xi-api-key": settings.elevenlabs_api_key},
+                timeout=settings.health_probe_timeout_seconds,
+            )
+            if response.is_success:
+                return {"ok": True, "latency_ms": _elapsed_ms(started), "detail": None}
+            return {"ok": False, "latency_ms": _elapsed_ms(started), "detail": f"HTTP {response.status_code}"}
+        except httpx.RequestError as e:
+            return {"ok": False, "latency_ms": _elapsed_ms(started), "detail": str(e) or type(e).__name__}
+
+    return probe
+
+
+def record_check(name: str, result: dict) -> None:
+    """Atualiza o cache de uma checagem e o `degraded_since` geral."""
+    previous = _state["checks"][name]
+    checked_at = _now_iso()
+    if result["ok"]:
+        down_since = None
+    else:
+        down_since = previous["down_since"] or checked_at
+    _state["checks"][name] = {
+        **result,
+        "checked_at": checked_at,
+        "checked_monotonic": time.monotonic(),
+        "down_since": down_since,
+    }
+    # Checagens que ainda não rodaram não marcam degradação (readiness já as trata como stale)
+    if all(check["ok"] for check in _state["checks"].values() if check["checked_at"]):
+        _state["degraded_since"] = None
+    elif _state["degraded_since"] is None:
+        _state["degraded_since"] = checked_at
+
+
+async def _run_check(name: str, probe: Callable[[], Awaitable[dict]], interval_seconds: int) -> None:
+    # Margem sobre o timeout: o probe já limita cada etapa, isto só garante o teto
+    hard_timeout = settings.health_probe_timeout_seconds * 3
+    while True:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(probe(), hard_timeout)
+        except asyncio.TimeoutError:
+            result = {"ok": False, "latency_ms": _elapsed_ms(started), "detail": f"timeout (> {hard_timeout}s)"}
+        except Exception as e:
+            result = {"ok": False, "latency_ms": _elapsed_ms(started), "detail": str(e)}
+        record_check(name, result)
+        await asyncio.sleep(interval_seconds)
+
+
+async def run_health_monitor(interval_seconds: int) -> None:
+    """Roda as checagens em loops independentes (DB e ElevenLabs)."""
+    async with httpx.AsyncClient() as client:
+        await asyncio.gather(
+            _run_check("database", _probe_database, interval_seconds),
+            _run_check("elevenlabs", _elevenlabs_probe(client), interval_seconds),
+        )
+
+
+def _is_stale(check: dict) -> bool:
+    last = check["checked_monotonic"]
+    return last is None or time.monotonic() - last > 3 * settings.health_probe_interval_seconds
+
+
+def readiness() -> tuple:
+    """
+    Retorna (status_code, corpo) da readiness a partir do cache.
+
+    - 503 se o DB está fora ou a checagem do DB está velha (monitor parado)
+    - 200 com status "degraded" se só a ElevenLabs está fora
+    """
+    checks = {
+        name: {key: value for key, value in check.items() if key != "checked_monotonic"}
+        for name, check in _state["checks"].items()
+    }
+    for name, check in _state["checks"].items():
+        checks[name]["stale"] = _is_stale(check)
+    database = checks["database"]
+    elevenlabs = checks["elevenlabs"]
+
+    if database["stale"] or not database["ok"]:
+        status, status_code = "unhealthy", 503
+    elif elevenlabs["stale"] or not elevenlabs["ok"]:
+        status, status_code = "degraded", 200
+    else:
+        status, status_code = "healthy", 200
+
+    checked = [check["checked_at"] for check in checks.values() if check["checked_at"]]
+    body = {
+        "status": status,
+        "database": "connected" if database["ok"] else "disconnected",
+        "checks": checks,
+        "pool": pool_stats(),
+        "last_probe_at": max(checked) if checked else None,
+        "degraded_since": _state["degraded_since"],
+    }
+    if not database["ok"] and database["detail"]:
+        body["detail"] = database["detail"]
+    return status_code, body
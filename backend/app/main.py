@@ -1,14 +1,54 @@
 """Aplicação FastAPI principal."""
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.routes import debug_logs, elevenlabs, leads, transcripts
-from app.config import settings
+
+from app import startup
+
+with startup.timed_import("fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
+with startup.timed_import("app.config"):
+    from app.config import settings
+with startup.timed_import("app.routes"):
+    from app.routes import debug_logs, elevenlabs, leads, transcripts
+with startup.timed_import("app.health"):
+    from app.health import readiness, run_health_monitor
+with startup.timed_import("app.request_decompression"):
+    from app.request_decompression import RequestDecompressionMiddleware, ingest_report, supported_encodings
+
+# Rotas que aceitam corpo comprimido (Content-Encoding)
+INGEST_PATHS = (
+    "/api/debug/browser-logs",
+    "/api/transcripts/stt",
+    "/api/transcripts/stt/batch",
+    "/api/transcripts/tts",
+    "/api/transcripts/tts/batch",
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from app.storage import init_storage_dirs
+    init_storage_dirs()
+    print(f"[CORS] Configurando CORS com origens permitidas: {settings.cors_origins_list}")
+
+    archiver_task = None
+    if settings.audio_archive_enabled:
+        from app.audio_archive import run_archiver
+        archiver_task = asyncio.create_task(
+            run_archiver(
+                settings.audio_archive_interval_seconds,
+                settings.audio_archive_after_days,
+                settings.audio_dir,
+            )
+        )
+    health_task = asyncio.create_task(run_health_monitor(settings.health_probe_interval_seconds))
+    startup.mark_ready()
     yield
+    health_task.cancel()
+    if archiver_task is not None:
+        archiver_task.cancel()
     if settings.database_url:
         try:
             from app.database import close_pool
@@ -24,10 +64,16 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# Configurar CORS - DEVE ser o primeiro middleware adicionado
-cors_origins = settings.cors_origins_list
-print(f"[CORS] Configurando CORS com origens permitidas: {cors_origins}")
+# Descompressão de corpos (gzip/deflate/br/zstd) nas rotas de ingestão.
+# Adicionado antes do CORS para que o CORS fique mais externo e também
+# decore as respostas 413/415 geradas aqui.
+app.add_middleware(
+    RequestDecompressionMiddleware,
+    max_body_bytes=settings.max_decompressed_body_bytes,
+    paths=INGEST_PATHS,
+)
 
+# Configurar CORS - DEVE ser o último middleware adicionado (mais externo)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Permitir todas as origens em desenvolvimento
@@ -56,24 +102,33 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/api/startup")
+async def api_startup():
+    """Relatório de cold start (tempo de import por módulo e tempo até pronto)."""
+    return startup.startup_report()
+
+
+@app.get("/api/ingest-stats")
+async def api_ingest_stats():
+    """Bytes recebidos vs. descomprimidos por rota de ingestão."""
+    return {"supported_encodings": supported_encodings(), "routes": ingest_report()}
+
+
+@app.get("/api/health/live")
+async def api_health_live():
+    """Liveness: o processo está de pé (não depende de DB nem ElevenLabs)."""
+    return {"status": "alive"}
+
+
+@app.get("/api/health/ready")
+async def api_health_ready():
+    """Readiness a partir do cache do monitor de saúde (tempo constante, sem usar o pool)."""
+    status_code, body = readiness()
+    return JSONResponse(status_code=status_code, content=body)
+
+
 @app.get("/api/health")
 async def api_health():
-    """Health check incluindo conexão com banco de dados."""
-    if not settings.database_url:
-        from fastapi.responses import JSONResponse
-        return JSONResponse(
-            status_code=503,
-            content={"status": "unhealthy", "database": "disconnected", "detail": "DATABASE_URL não configurado"},
-        )
-    try:
-        from app.database import get_pool
-        pool = await get_pool()
-        async with pool.acquire() as conn:
-            await conn.fetchval("SELECT 1")
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        from fastapi.responses import JSONResponse
-        return JSONResponse(
-            status_code=503,
-            content={"status": "unhealthy", "database": "disconnected", "detail": str(e)},
-        )
+    """Health check incluindo banco de dados (mesmo cache da readiness)."""
+    status_code, body = readiness()
+    return JSONResponse(status_code=status_code, content=body)
@@ -0,0 +1,305 @@
+"""Middleware ASGI para aceitar corpos de request comprimidos (gzip/deflate/br/zstd).
+
+O corpo é descomprimido em streaming, chunk a chunk, com limite de tamanho
+descomprimido (proteção contra zip bomb). Depois da descompressão o app recebe
+o corpo puro, sem `Content-Encoding`, então as rotas não mudam.
+
+Referências:
+- https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Content-Encoding
+- https://asgi.readthedocs.io/en/latest/specs/www.html
+"""
+import io
+import json
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # opcional: sem brotli, "br" responde 415
+    brotli = None
+if brotli is not None and not hasattr(brotli.Decompressor, "can_accept_more_data"):
+    brotli = None  # brotli < 1.2 não limita a saída por chamada
+
+try:
+    import zstandard
+except ImportError:  # opcional: sem zstandard, "zstd" responde 415
+    zstandard = None
+
+
+class BodyTooLarge(Exception):
+    """Corpo descomprimido excedeu o limite configurado."""
+
+
+# Tamanho máximo da saída produzida por chamada ao decoder: toda descompressão
+# avança em passos limitados e o total é checado a cada passo, então um corpo
+# pequeno que expande muito (zip bomb) nunca aloca muito além do limite
+_OUTPUT_STEP = 64 * 1024
+
+
+class _ZlibDecoder:
+    """
+    gzip/deflate. Com `multi_member`, bytes após o fim de um stream iniciam um
+    novo membro (gzip concatenado, RFC 1952 §2.2); sem ele, são corpo inválido.
+    """
+
+    def __init__(self, wbits: int, multi_member: bool = False):
+        self._wbits = wbits
+        self._multi_member = multi_member
+        self._obj = zlib.decompressobj(wbits)
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        out = []
+        total = 0
+        while data:
+            if self._obj.eof:
+                if not self._multi_member:
+                    raise ValueError("dados após o fim do stream")
+                self._obj = zlib.decompressobj(self._wbits)
+            chunk = self._obj.decompress(data, _OUTPUT_STEP)
+            total += len(chunk)
+            if total > max_length:
+                raise BodyTooLarge()
+            out.append(chunk)
+            data = self._obj.unused_data if self._obj.eof else self._obj.unconsumed_tail
+        return b"".join(out)
+
+    def flush(self, max_length: int) -> bytes:
+        out = self._obj.flush()
+        if len(out) > max_length:
+            raise BodyTooLarge()
+        if not self._obj.eof:
+            raise ValueError("stream truncado")
+        return out
+
+
+class _BrotliDecoder:
+    """Requer brotli >= 1.2 (`output_buffer_limit` / `can_accept_more_data`)."""
+
+    def __init__(self):
+        self._obj = brotli.Decompressor()
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        out = []
+        total = 0
+        chunk = self._obj.process(data, output_buffer_limit=_OUTPUT_STEP)
+        while True:
+            total += len(chunk)
+            if total > max_length:
+                raise BodyTooLarge()
+            out.append(chunk)
+            # Com saída pendente, process() só aceita entrada vazia
+            if self._obj.can_accept_more_data():
+                return b"".join(out)
+            chunk = self._obj.process(b"", output_buffer_limit=_OUTPUT_STEP)
+
+    def flush(self, max_length: int) -> bytes:
+        out = []
+        total = 0
+        while not self._obj.is_finished():
+            chunk = self._obj.process(b"", output_buffer_limit=_OUTPUT_STEP)
+            if not chunk:
+                raise ValueError("stream brotli incompleto")
+            total += len(chunk)
+            if total > max_length:
+                raise BodyTooLarge()
+            out.append(chunk)
+        return b"".join(out)
+
+
+class _ZstdDecoder:
+    """
+    Acumula a entrada comprimida (limitada pelo middleware) e descomprime no fim.
+
+    Primeiro mede a saída com stream_reader, lendo pedaços de tamanho fixo e
+    descartando-os, até o limite; só então descomprime de fato, frame a frame,
+    exigindo o fim de cada frame (stream_reader aceita entrada truncada em silêncio).
+    """
+
+    def __init__(self):
+        self._input = io.BytesIO()
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        self._input.write(data)
+        return b""
+
+    def flush(self, max_length: int) -> bytes:
+        data = self._input.getvalue()
+        reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+        total = 0
+        with reader:
+            while True:
+                chunk = reader.read(_OUTPUT_STEP)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_length:
+                    raise BodyTooLarge()
+
+        out = []
+        while data:
+            obj = zstandard.ZstdDecompressor().decompressobj()
+            out.append(obj.decompress(data))
+            if not obj.eof:
+                raise ValueError("stream truncado")
+            data = obj.unused_data
+        return b"".join(out)
+
+
+def _decoder_for(encoding: str):
+    """Retorna um decoder incremental para o Content-Encoding, ou None se não suportado."""
+    if encoding in ("gzip", "x-gzip"):
+        return _ZlibDecoder(16 + zlib.MAX_WBITS, multi_member=True)
+    if encoding == "deflate":
+        return _ZlibDecoder(zlib.MAX_WBITS)
+    if encoding == "br" and brotli is not None:
+        return _BrotliDecoder()
+    if encoding == "zstd" and zstandard is not None:
+        return _ZstdDecoder()
+    return None
+
+
+def supported_encodings() -> list:
+    encodings = ["gzip", "deflate"]
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    return encodings
+
+
+# Métricas de ingestão por rota: bytes trafegados vs. bytes descomprimidos
+# (só requests aceitos; os rejeitados por 400/413/415 são contados à parte)
+ingest_stats: Dict[str, Dict[str, int]] = defaultdict(
+    lambda: {
+        "requests": 0,
+        "compressed_requests": 0,
+        "wire_bytes": 0,
+        "body_bytes": 0,
+        "rejected_requests": 0,
+        "rejected_wire_bytes": 0,
+    }
+)
+
+
+def ingest_report() -> dict:
+    """Resumo das métricas de ingestão (bytes economizados e taxa de compressão)."""
+    report = {}
+    for path, stats in ingest_stats.items():
+        body = stats["body_bytes"]
+        report[path] = {
+            **stats,
+            "saved_bytes": body - stats["wire_bytes"],
+            "ratio": round(body / stats["wire_bytes"], 2) if stats["wire_bytes"] else None,
+        }
+    return report
+
+
+class RequestDecompressionMiddleware:
+    """Descomprime corpos de request conforme `Content-Encoding`."""
+
+    def __init__(self, app: Callable, max_body_bytes: int, paths: Optional[tuple] = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (self.paths and scope["path"] not in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = headers.get(b"content-encoding", b"").decode("latin-1").strip().lower()
+        stats = ingest_stats[scope["path"]]
+
+        if encoding in ("", "identity"):
+            stats["requests"] += 1
+
+            async def counting_receive():
+                message = await receive()
+                if message["type"] == "http.request":
+                    size = len(message.get("body", b""))
+                    stats["wire_bytes"] += size
+                    stats["body_bytes"] += size
+                return message
+
+            await self.app(scope, counting_receive, send)
+            return
+
+        decoder = _decoder_for(encoding)
+        if decoder is None:
+            stats["rejected_requests"] += 1
+            await self._reject(send, 415, f"Content-Encoding não suportado: {encoding}")
+            return
+
+        chunks = []
+        total = 0
+        wire_bytes = 0
+        try:
+            more_body = True
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                data = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                wire_bytes += len(data)
+                # Corpo comprimido maior que o limite descomprimido não faz sentido
+                if wire_bytes > self.max_body_bytes:
+                    raise BodyTooLarge()
+                out = decoder.decompress(data, self.max_body_bytes - total)
+                total += len(out)
+                chunks.append(out)
+            out = decoder.flush(self.max_body_bytes - total)
+            total += len(out)
+            chunks.append(out)
+        except BodyTooLarge:
+            self._count_rejected(stats, wire_bytes)
+            await self._reject(send, 413, f"Corpo descomprimido excede {self.max_body_bytes} bytes")
+            return
+        except Exception as e:
+            self._count_rejected(stats, wire_bytes)
+            await self._reject(send, 400, f"Corpo comprimido inválido ({encoding}): {e}")
+            return
+
+        stats["requests"] += 1
+        stats["compressed_requests"] += 1
+        stats["wire_bytes"] += wire_bytes
+        stats["body_bytes"] += total
+        body = b"".join(chunks)
+        new_headers = [
+            (name, value)
+            for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        new_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = {**scope, "headers": new_headers}
+
+        sent = False
+
+        async def decompressed_receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, decompressed_receive, send)
+
+    @staticmethod
+    def _count_rejected(stats: Dict[str, int], wire_bytes: int) -> None:
+        stats["rejected_requests"] += 1
+        stats["rejected_wire_bytes"] += wire_bytes
+
+    @staticmethod
+    async def _reject(send, status_code: int, detail: str) -> None:
+        payload = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
@@ -1,16 +1,14 @@
 """Rotas para capturar logs do console do navegador."""
 from datetime import datetime
-from pathlib import Path
 from typing import List, Optional
 import re
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
-router = APIRouter(prefix="/api/debug", tags=["debug"])
+from app.storage import append_session_log
 
-DEBUG_DIR = Path("data") / "debug" / "browser_logs"
-DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+router = APIRouter(prefix="/api/debug", tags=["debug"])
 
 
 class BrowserLogEntry(BaseModel):
@@ -39,23 +37,22 @@ async def save_browser_logs(batch: BrowserLogBatch):
 
     try:
         session_id = sanitize_filename(batch.session_id)
-        log_file = DEBUG_DIR / f"{session_id}.log"
-        first_write = not log_file.exists()
-
-        with open(log_file, "a", encoding="utf-8") as f:
-            if first_write:
-                created_at = datetime.utcnow().isoformat()
-                f.write(f"# Browser log session: {session_id}\n")
-                f.write(f"# Created at (UTC): {created_at}\n")
-                if batch.lead_email:
-                    f.write(f"# Lead email: {batch.lead_email}\n")
-                f.write("\n")
-
-            for entry in batch.entries:
-                ts = entry.timestamp or datetime.utcnow().isoformat()
-                level = (entry.level or "log").upper()
-                message = entry.message.replace("\n", "\\n")
-                f.write(f"[{ts}] [{level}] {message}\n")
+
+        created_at = datetime.utcnow().isoformat()
+        header = f"# Browser log session: {session_id}\n"
+        header += f"# Created at (UTC): {created_at}\n"
+        if batch.lead_email:
+            header += f"# Lead email: {batch.lead_email}\n"
+        header += "\n"
+
+        lines = []
+        for entry in batch.entries:
+            ts = entry.timestamp or datetime.utcnow().isoformat()
+            level = (entry.level or "log").upper()
+            message = entry.message.replace("\n", "\\n")
+            lines.append(f"[{ts}] [{level}] {message}\n")
+
+        log_file = append_session_log(session_id, header, "".join(lines))
 
         return {
             "success": True,
@@ -64,3 +61,4 @@ async def save_browser_logs(batch: BrowserLogBatch):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao salvar logs: {str(e)}")
+
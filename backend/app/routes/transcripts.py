@@ -1,13 +1,19 @@
 """Rotas para salvar transcrições STT e áudios TTS."""
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import asyncio
 import os
 import base64
 import io
+import time
 from datetime import datetime
 from pathlib import Path
-from pydub import AudioSegment
+
+from app import startup
+from app.audio_archive import archived_names
+from app.config import settings
+from app.storage import write_unique_file
 
 router = APIRouter(prefix="/api/transcripts", tags=["transcripts"])
 
@@ -29,14 +35,28 @@ class AudioData(BaseModel):
     audio_format: Optional[str] = None
 
 
-# Garantir que os diretórios existem
-DATA_DIR = Path("data")
-TRANSCRIPTS_DIR = DATA_DIR / "transcripts"
-AUDIO_DIR = DATA_DIR / "audio"
+class TranscriptBatch(BaseModel):
+    items: List[TranscriptData] = Field(default_factory=list)
+
+
+class AudioBatch(BaseModel):
+    items: List[AudioData] = Field(default_factory=list)
+
 
-DATA_DIR.mkdir(exist_ok=True)
-TRANSCRIPTS_DIR.mkdir(exist_ok=True)
-AUDIO_DIR.mkdir(exist_ok=True)
+_audio_segment_cls = None
+
+
+def get_audio_segment_cls():
+    """
+    Carrega pydub sob demanda (primeiro áudio PCM), evitando o custo no cold start.
+    """
+    global _audio_segment_cls
+    if _audio_segment_cls is None:
+        started = time.perf_counter()
+        from pydub import AudioSegment
+        _audio_segment_cls = AudioSegment
+        startup.record_lazy_load("pydub", started)
+    return _audio_segment_cls
 
 
 def get_lead_dir(lead_email: str) -> Path:
@@ -45,7 +65,7 @@ def get_lead_dir(lead_email: str) -> Path:
     safe_email = lead_email.replace("@", "_at_").replace(".", "_")
     # Remover caracteres inválidos
     safe_email = "".join(c for c in safe_email if c.isalnum() or c in ["_", "-"])
-    lead_dir = TRANSCRIPTS_DIR / safe_email
+    lead_dir = settings.transcripts_dir / safe_email
     lead_dir.mkdir(parents=True, exist_ok=True)
     print(f"[STT] Diretório do lead: {lead_dir}")  # Debug log
     return lead_dir
@@ -71,7 +91,7 @@ def get_audio_dir(lead_email: str, speaker: str = "user") -> Path:
         subfolder = "user_audio"
     
     # Criar estrutura: data/audio/{email}/user_audio/ ou data/audio/{email}/agent_audio/
-    audio_dir = AUDIO_DIR / safe_email / subfolder
+    audio_dir = settings.audio_dir / safe_email / subfolder
     audio_dir.mkdir(parents=True, exist_ok=True)
     print(f"[TTS] Diretório de áudio do lead ({speaker}): {audio_dir}")  # Debug log
     return audio_dir
@@ -95,16 +115,15 @@ async def save_stt_transcript(transcript: TranscriptData):
         safe_timestamp = timestamp.replace(":", "-").replace(".", "-").replace("T", "_").replace("Z", "")
         # Remover caracteres inválidos restantes
         safe_timestamp = "".join(c for c in safe_timestamp if c.isalnum() or c in ["-", "_"])
-        filename = f"{safe_timestamp}_{transcript.speaker}.txt"
-        filepath = lead_dir / filename
-        
-        print(f"[STT] Salvando em: {filepath}")
-        
-        # Salvar transcrição
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write(f"Speaker: {transcript.speaker}\n")
-            f.write(f"Text: {transcript.text}\n")
+        # Criação atômica: timestamps iguais (vários workers) ganham sufixo _1, _2, ...
+        content = (
+            f"Timestamp: {timestamp}\n"
+            f"Speaker: {transcript.speaker}\n"
+            f"Text: {transcript.text}\n"
+        )
+        filepath = write_unique_file(
+            lead_dir, f"{safe_timestamp}_{transcript.speaker}", ".txt", content.encode("utf-8")
+        )
         
         print(f"[STT] Arquivo salvo com sucesso: {filepath}")
         
@@ -124,11 +143,19 @@ async def save_stt_transcript(transcript: TranscriptData):
 async def save_tts_audio(audio: AudioData):
     """
     Salva um áudio TTS ou STT (usuário) em arquivo MP3.
+
+    Decodificação, conversão (pydub/ffmpeg) e gravação são bloqueantes: rodam
+    numa thread para não travar o event loop enquanto o áudio é convertido.
     
     Referência: 
     - https://docs.python.org/3/library/base64.html
     - https://github.com/jiaaro/pydub
+    - https://docs.python.org/3/library/asyncio-task.html#asyncio.to_thread
     """
+    return await asyncio.to_thread(_save_tts_audio_sync, audio)
+
+
+def _save_tts_audio_sync(audio: AudioData) -> dict:
     try:
         print(f"[TTS] Recebendo áudio: email={audio.lead_email}, speaker={audio.speaker}, lead_id={audio.lead_id}")
         
@@ -155,10 +182,13 @@ async def save_tts_audio(audio: AudioData):
         passthrough_formats = {"webm", "ogg", "wav", "mp3", "m4a"}
         incoming_format = (audio.audio_format or "").lower().strip()
         if incoming_format in passthrough_formats:
-            filename = f"{safe_timestamp}_{audio.speaker}_{event_id}.{incoming_format}"
-            filepath = audio_dir / filename
-            with open(filepath, "wb") as f:
-                f.write(audio_bytes)
+            filepath = write_unique_file(
+                audio_dir,
+                f"{safe_timestamp}_{audio.speaker}_{event_id}",
+                f".{incoming_format}",
+                audio_bytes,
+                reserved=archived_names(audio_dir),
+            )
             print(f"[TTS] Áudio {incoming_format.upper()} salvo (passthrough): {filepath}")
             return {
                 "success": True,
@@ -176,6 +206,7 @@ async def save_tts_audio(audio: AudioData):
             # O áudio vem em formato PCM 16-bit do Conversational AI (16kHz) ou do usuário (16kHz)
             # Ambos usam 16kHz conforme metadata: agent_output_audio_format: "pcm_16000"
             sample_rate = 16000
+            AudioSegment = get_audio_segment_cls()
             audio_segment = AudioSegment(
                 audio_bytes,
                 frame_rate=sample_rate,
@@ -211,15 +242,15 @@ async def save_tts_audio(audio: AudioData):
                 mp3_bytes = audio_bytes
                 audio_format = "pcm"
         
-        # Nome do arquivo: timestamp_speaker_eventId.{format}
-        filename = f"{safe_timestamp}_{audio.speaker}_{event_id}.{audio_format}"
-        filepath = audio_dir / filename
-        
-        print(f"[TTS] Salvando áudio {audio_format.upper()} em: {filepath}, tamanho: {len(mp3_bytes)} bytes")
-        
-        # Salvar áudio
-        with open(filepath, "wb") as f:
-            f.write(mp3_bytes)
+        # Nome do arquivo: timestamp_speaker_eventId.{format} (sufixo _N em caso de colisão)
+        print(f"[TTS] Salvando áudio {audio_format.upper()}, tamanho: {len(mp3_bytes)} bytes")
+        filepath = write_unique_file(
+            audio_dir,
+            f"{safe_timestamp}_{audio.speaker}_{event_id}",
+            f".{audio_format}",
+            mp3_bytes,
+            reserved=archived_names(audio_dir),
+        )
         
         print(f"[TTS] Áudio {audio_format.upper()} salvo com sucesso: {filepath}")
         
@@ -240,3 +271,32 @@ async def save_tts_audio(audio: AudioData):
             status_code=500,
             detail=f"Erro ao salvar áudio: {str(e)}"
         )
+
+
+async def _save_batch(handler, items: list) -> dict:
+    """Salva vários itens numa chamada; falhas individuais não abortam o lote."""
+    results = []
+    for item in items:
+        try:
+            results.append(await handler(item))
+        except HTTPException as e:
+            results.append({"success": False, "detail": e.detail})
+    saved = sum(1 for r in results if r["success"])
+    return {
+        "success": saved == len(results),
+        "saved": saved,
+        "failed": len(results) - saved,
+        "results": results,
+    }
+
+
+@router.post("/stt/batch")
+async def save_stt_transcripts_batch(batch: TranscriptBatch):
+    """Salva várias transcrições STT numa única requisição."""
+    return await _save_batch(save_stt_transcript, batch.items)
+
+
+@router.post("/tts/batch")
+async def save_tts_audios_batch(batch: AudioBatch):
+    """Salva vários áudios numa única requisição (ex.: chunks PCM acumulados)."""
+    return await _save_batch(save_tts_audio, batch.items)
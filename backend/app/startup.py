@@ -0,0 +1,47 @@
+"""Medição do tempo de inicialização (cold start) da aplicação."""
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Marco zero: primeiro import deste módulo (feito no topo de app.main)
+_STARTED = time.perf_counter()
+
+import_times_ms: Dict[str, float] = {}
+lazy_load_times_ms: Dict[str, float] = {}
+_ready_ms: Optional[float] = None
+
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+@contextmanager
+def timed_import(name: str):
+    """Mede o tempo de import de um módulo (ou grupo de módulos)."""
+    started = time.perf_counter()
+    yield
+    import_times_ms[name] = _elapsed_ms(started)
+
+
+def record_lazy_load(name: str, started: float) -> None:
+    """Registra um módulo carregado sob demanda (ex.: pydub no primeiro áudio)."""
+    lazy_load_times_ms[name] = _elapsed_ms(started)
+    print(f"[STARTUP] {name} carregado sob demanda em {lazy_load_times_ms[name]} ms")
+
+
+def mark_ready() -> None:
+    """Marca o fim do startup (chamado no lifespan, antes do primeiro request)."""
+    global _ready_ms
+    _ready_ms = _elapsed_ms(_STARTED)
+    imports = ", ".join(f"{name}={ms} ms" for name, ms in import_times_ms.items())
+    print(f"[STARTUP] Imports: {imports}")
+    print(f"[STARTUP] Pronto em {_ready_ms} ms")
+
+
+def startup_report() -> dict:
+    """Relatório de cold start: tempo de import por módulo e tempo até ficar pronto."""
+    return {
+        "imports_ms": dict(import_times_ms),
+        "lazy_loads_ms": dict(lazy_load_times_ms),
+        "ready_ms": _ready_ms,
+    }
@@ -0,0 +1,178 @@
+"""Camada de armazenamento em disco (transcrições, áudios, logs do navegador).
+
+Seguro para vários workers/réplicas escrevendo no mesmo volume:
+- Arquivos de conteúdo (STT/TTS) são criados de forma atômica via hard link,
+  com sufixo único em caso de colisão de nome — nunca sobrescrevem outro arquivo.
+- Logs de sessão são gravados em segmentos por worker (um único escritor por
+  arquivo, O_APPEND, um write() por lote) e mesclados na leitura.
+
+Para ler o log mesclado de uma sessão (uso interno, sem rota HTTP):
+    python -m app.storage <session_id>
+"""
+import argparse
+import os
+import re
+import socket
+import uuid
+from pathlib import Path
+from typing import Container, List, Tuple
+
+from app.config import settings
+
+_LOG_LINE = re.compile(r"^\[(?P<ts>[^\]]*)\] ")
+
+
+def init_storage_dirs() -> None:
+    """Cria os diretórios de dados configurados. Chamado no lifespan da aplicação."""
+    for directory in (
+        settings.data_dir,
+        settings.transcripts_dir,
+        settings.audio_dir,
+        settings.debug_logs_dir,
+    ):
+        directory.mkdir(parents=True, exist_ok=True)
+    print(f"[STORAGE] Diretórios de dados em: {settings.data_dir.resolve()}")
+
+
+def worker_id() -> str:
+    """Identificador do processo escritor (host + pid), usado nos segmentos."""
+    host = re.sub(r"[^a-zA-Z0-9_-]", "_", socket.gethostname())
+    return f"{host}-{os.getpid()}"
+
+
+def write_unique_file(
+    directory: Path, stem: str, suffix: str, data: bytes, reserved: Container[str] = ()
+) -> Path:
+    """
+    Grava `data` em `directory/{stem}{suffix}` sem sobrescrever arquivos existentes.
+
+    O conteúdo é gravado num arquivo temporário e publicado com os.link, que é
+    atômico e falha se o destino já existe; em caso de colisão tenta
+    `{stem}_1{suffix}`, `{stem}_2{suffix}`, ... Leitores nunca veem arquivo parcial.
+
+    Em volumes sem hard link (SMB/Azure Files, alguns FUSE) cai para
+    os.open(O_CREAT | O_EXCL) + write: continua sem sobrescrever, mas um leitor
+    concorrente pode ver o arquivo ainda incompleto.
+
+    Args:
+        reserved: Nomes já usados fora do diretório (ex.: chunks no bundle de
+            arquivamento), tratados como colisão.
+
+    Returns:
+        O caminho final do arquivo.
+    """
+    tmp_path = directory / f".{stem}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    use_link = True
+    try:
+        attempt = 0
+        while True:
+            name = f"{stem}{suffix}" if attempt == 0 else f"{stem}_{attempt}{suffix}"
+            attempt += 1
+            if name in reserved:
+                continue
+            target = directory / name
+            if use_link:
+                try:
+                    os.link(tmp_path, target)
+                    return target
+                except FileExistsError:
+                    continue
+                except OSError:
+                    use_link = False
+            try:
+                fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return target
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def session_log_dir(session_id: str) -> Path:
+    """Diretório com os segmentos de log de uma sessão."""
+    return settings.debug_logs_dir / session_id
+
+
+def append_session_log(session_id: str, header: str, body: str) -> Path:
+    """
+    Acrescenta `body` ao segmento deste worker para a sessão.
+
+    `header` é gravado apenas quando o segmento é criado (O_EXCL decide quem cria,
+    sem corrida entre exists() e open()). Cabeçalho e lote saem num único write()
+    com O_APPEND, então lotes nunca se intercalam.
+    """
+    segment_dir = session_log_dir(session_id)
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    segment = segment_dir / f"{worker_id()}.log"
+    try:
+        fd = os.open(segment, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+        payload = header + body
+    except FileExistsError:
+        fd = os.open(segment, os.O_WRONLY | os.O_APPEND)
+        payload = body
+    try:
+        data = payload.encode("utf-8")
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+    finally:
+        os.close(fd)
+    return segment
+
+
+def read_session_log(session_id: str) -> str:
+    """
+    Mescla os segmentos de uma sessão num único log ordenado por timestamp.
+
+    Linhas de cabeçalho (#) vêm do segmento mais antigo; entradas de todos os
+    segmentos são ordenadas pelo timestamp, mantendo a ordem original em empates.
+    Inclui o arquivo legado `{session_id}.log` (formato anterior, um arquivo só).
+
+    Raises:
+        FileNotFoundError: se a sessão não tem nenhum log.
+    """
+    segments: List[Path] = []
+    legacy = settings.debug_logs_dir / f"{session_id}.log"
+    if legacy.is_file():
+        segments.append(legacy)
+    segment_dir = session_log_dir(session_id)
+    if segment_dir.is_dir():
+        segments.extend(sorted(segment_dir.glob("*.log")))
+    if not segments:
+        raise FileNotFoundError(session_id)
+
+    headers: List[Tuple[str, List[str]]] = []
+    entries: List[Tuple[str, int, str]] = []
+    for segment in segments:
+        segment_header: List[str] = []
+        with open(segment, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line:
+                    continue
+                if line.startswith("#"):
+                    segment_header.append(line)
+                    continue
+                match = _LOG_LINE.match(line)
+                entries.append((match.group("ts") if match else "", len(entries), line))
+        if segment_header:
+            headers.append((segment_header[1] if len(segment_header) > 1 else "", segment_header))
+
+    entries.sort(key=lambda entry: (entry[0], entry[1]))
+    lines = min(headers)[1] + [""] if headers else []
+    lines.extend(line for _, _, line in entries)
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mostra o log mesclado de uma sessão do navegador.")
+    parser.add_argument("session_id", help="ID da sessão (browser_log_session_id)")
+    args = parser.parse_args()
+    try:
+        print(read_session_log(re.sub(r"[^a-zA-Z0-9_-]", "_", args.session_id.strip())[:120]), end="")
+    except FileNotFoundError:
+        raise SystemExit(f"Sessão de log não encontrada: {args.session_id}")
@@ -0,0 +1,19 @@
+"""Configuração comum dos testes do backend."""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Permite `import app` rodando `pytest` a partir de backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Settings exige a chave da ElevenLabs; os testes não chamam a API
+os.environ.setdefault("ELEVENLABS_API_KEY", "test-key")
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Aponta DATA_DIR para um diretório temporário."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "data_dir", tmp_path / "data")
+    return settings.data_dir
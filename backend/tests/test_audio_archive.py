@@ -0,0 +1,165 @@
+"""Testes do arquivamento de áudios em bundles por lead."""
+import multiprocessing
+import os
+import time
+import zipfile
+from pathlib import Path
+
+from app import audio_archive
+
+OLD = time.time() - 30 * 86400
+
+
+def _write_chunk(path: Path, data: bytes, mtime: float = OLD) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    os.utime(path, (mtime, mtime))
+
+
+def _make_lead(audio_dir: Path, name: str, count: int) -> dict:
+    chunks = {}
+    for i in range(count):
+        for subfolder, ext in (("user_audio", "webm"), ("agent_audio", "pcm")):
+            relpath = f"{subfolder}/{i}.{ext}"
+            data = os.urandom(64) + bytes([i % 256]) * (500 * i)
+            _write_chunk(audio_dir / name / relpath, data)
+            chunks[relpath] = data
+    return chunks
+
+
+def test_archive_and_random_access_read(tmp_path):
+    audio_dir = tmp_path / "audio"
+    chunks = _make_lead(audio_dir, "lead_a", 20)
+    _write_chunk(audio_dir / "lead_a" / "user_audio" / "recent.webm", b"recent", mtime=time.time())
+
+    report = audio_archive.archive_all(audio_dir, older_than_days=7)
+
+    lead_dir = audio_dir / "lead_a"
+    assert report["files"] == len(chunks)
+    assert report["reclaimed_bytes"] > 0
+    assert (lead_dir / "user_audio" / "recent.webm").exists()
+    assert sorted(p.name for p in (lead_dir / "agent_audio").iterdir()) == []
+    for relpath, data in chunks.items():
+        assert audio_archive.read_chunk(lead_dir, relpath) == data
+    assert audio_archive.read_chunk(lead_dir, "user_audio/recent.webm") == b"recent"
+    assert audio_archive.read_chunk(lead_dir, "user_audio/missing.webm") is None
+
+
+def test_rewritten_chunk_with_archived_name_is_not_lost(tmp_path):
+    audio_dir = tmp_path / "audio"
+    lead_dir = audio_dir / "lead_a"
+    _write_chunk(lead_dir / "user_audio" / "a0.pcm", b"old content")
+    audio_archive.archive_all(audio_dir, older_than_days=7)
+
+    _write_chunk(lead_dir / "user_audio" / "a0.pcm", b"new content")
+    report = audio_archive.archive_all(audio_dir, older_than_days=7)
+
+    assert report["files"] == 1
+    assert audio_archive.read_chunk(lead_dir, "user_audio/a0.pcm") == b"old content"
+    assert audio_archive.read_chunk(lead_dir, "user_audio/a0_1.pcm") == b"new content"
+
+    # Chunk idêntico ao já arquivado (rodada interrompida): só remove o arquivo solto
+    _write_chunk(lead_dir / "user_audio" / "a0.pcm", b"old content")
+    audio_archive.archive_all(audio_dir, older_than_days=7)
+    assert not (lead_dir / "user_audio" / "a0.pcm").exists()
+    assert "user_audio/a0_2.pcm" not in audio_archive._load_index(lead_dir)
+
+
+def _archive_worker(audio_dir: str, errors) -> None:
+    for _ in range(5):
+        report = audio_archive.archive_all(Path(audio_dir), older_than_days=7)
+        errors.put(report["errors"])
+
+
+def test_concurrent_archivers_do_not_corrupt_bundles(tmp_path):
+    audio_dir = tmp_path / "audio"
+    expected = {name: _make_lead(audio_dir, name, 30) for name in ("lead_a", "lead_b", "lead_c")}
+
+    errors = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_archive_worker, args=(str(audio_dir), errors))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert sum(errors.get() for _ in range(4 * 5)) == 0
+    for name, chunks in expected.items():
+        lead_dir = audio_dir / name
+        assert len(audio_archive._load_index(lead_dir)) == len(chunks)
+        for relpath, data in chunks.items():
+            assert not (lead_dir / relpath).exists()
+            assert audio_archive.read_chunk(lead_dir, relpath) == data
+
+
+def test_archived_names_are_reserved_for_new_chunks(tmp_path):
+    from app.storage import write_unique_file
+
+    audio_dir = tmp_path / "audio"
+    user_dir = audio_dir / "lead_a" / "user_audio"
+    _write_chunk(user_dir / "ts_user_0.webm", b"archived")
+    audio_archive.archive_all(audio_dir, older_than_days=7)
+
+    assert audio_archive.archived_names(user_dir) == {"ts_user_0.webm"}
+    path = write_unique_file(
+        user_dir, "ts_user_0", ".webm", b"new", reserved=audio_archive.archived_names(user_dir)
+    )
+    assert path.name == "ts_user_0_1.webm"
+    assert audio_archive.read_chunk(user_dir.parent, "user_audio/ts_user_0.webm") == b"archived"
+
+
+def test_interrupted_append_is_recovered(tmp_path):
+    audio_dir = tmp_path / "audio"
+    lead_dir = audio_dir / "lead_a"
+    chunks = _make_lead(audio_dir, "lead_a", 5)
+    audio_archive.archive_all(audio_dir, older_than_days=7)
+
+    # Simula queda no meio de um append: o membro novo sobrescreveu o diretório
+    # central e ficou pela metade
+    bundle = lead_dir / audio_archive.BUNDLE_NAME
+    with zipfile.ZipFile(bundle) as zf:
+        end_of_members = max(
+            audio_archive._data_offset(zf.fp, info.header_offset) + info.compress_size
+            for info in zf.infolist()
+        )
+    with open(bundle, "r+b") as fp:
+        fp.truncate(end_of_members)
+        fp.seek(end_of_members)
+        fp.write(b"PK\x03\x04" + os.urandom(100))
+
+    _write_chunk(lead_dir / "user_audio" / "late.webm", b"late chunk")
+    report = audio_archive.archive_all(audio_dir, older_than_days=7)
+
+    assert report["errors"] == 0
+    assert zipfile.ZipFile(bundle).testzip() is None
+    for relpath, data in chunks.items():
+        assert audio_archive.read_chunk(lead_dir, relpath) == data
+    assert audio_archive.read_chunk(lead_dir, "user_audio/late.webm") == b"late chunk"
+
+
+def test_archived_names_rereads_index_only_when_it_changes(tmp_path, monkeypatch):
+    audio_dir = tmp_path / "audio"
+    user_dir = audio_dir / "lead_a" / "user_audio"
+    _write_chunk(user_dir / "a.webm", b"a")
+    audio_archive.archive_all(audio_dir, older_than_days=7)
+
+    loads = []
+    load_index = audio_archive._load_index
+
+    def counting_load_index(lead_dir):
+        loads.append(lead_dir)
+        return load_index(lead_dir)
+
+    monkeypatch.setattr(audio_archive, "_load_index", counting_load_index)
+
+    assert audio_archive.archived_names(user_dir) == {"a.webm"}
+    assert audio_archive.archived_names(user_dir) == {"a.webm"}
+    assert audio_archive.archived_names(audio_dir / "lead_a" / "agent_audio") == frozenset()
+    assert len(loads) == 1
+
+    _write_chunk(user_dir / "b.webm", b"b")
+    audio_archive.archive_all(audio_dir, older_than_days=7)
+    assert audio_archive.archived_names(user_dir) == {"a.webm", "b.webm"}
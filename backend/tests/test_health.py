@@ -0,0 +1,105 @@
+"""Testes do monitor de saúde e da readiness em cache."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app import database, health
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(health, "_state", {
+        "checks": {name: health._unchecked() for name in health.CHECKS},
+        "degraded_since": None,
+    })
+    monkeypatch.setattr(database, "_pool", None)
+    monkeypatch.setattr(database, "_pool_task", None)
+    monkeypatch.setattr(settings, "database_url", "postgresql://user:pw@db.invalid/postgres")
+    monkeypatch.setattr(settings, "health_probe_timeout_seconds", 0.1)
+    monkeypatch.setattr(settings, "health_probe_interval_seconds", 1)
+
+
+@pytest.fixture
+def slow_pool_creation(monkeypatch):
+    """Simula o DB fora do ar: a criação do pool fica presa na cadeia de retry."""
+    calls = []
+
+    async def create_pool():
+        calls.append(time.monotonic())
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(database, "_create_pool", create_pool)
+    return calls
+
+
+def _elevenlabs_client(status_code: int) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(status_code)))
+
+
+def test_db_probe_is_bounded_while_pool_is_connecting(slow_pool_creation):
+    async def scenario():
+        started = time.monotonic()
+        result = await health._probe_database()
+        elapsed = time.monotonic() - started
+        # Um request real e um segundo probe esperam a mesma tentativa de criação
+        request = asyncio.create_task(database.get_pool())
+        second = await health._probe_database()
+        await asyncio.sleep(0)
+        request.cancel()
+        database._pool_task.cancel()
+        return result, second, elapsed
+
+    result, second, elapsed = asyncio.run(scenario())
+    assert elapsed < 1
+    assert not result["ok"] and "conectando" in result["detail"]
+    assert not second["ok"]
+    assert len(slow_pool_creation) == 1
+
+
+def test_checks_are_cached_independently(slow_pool_creation):
+    async def scenario():
+        async with _elevenlabs_client(200) as client:
+            monitor = asyncio.gather(
+                health._run_check("database", health._probe_database, 1),
+                health._run_check("elevenlabs", health._elevenlabs_probe(client), 1),
+            )
+            await asyncio.sleep(0.5)
+            monitor.cancel()
+            database._pool_task.cancel()
+
+    asyncio.run(scenario())
+    status_code, body = health.readiness()
+
+    assert status_code == 503
+    assert body["status"] == "unhealthy"
+    assert body["checks"]["elevenlabs"]["ok"] is True
+    assert body["checks"]["elevenlabs"]["stale"] is False
+    assert body["checks"]["database"]["stale"] is False
+    assert body["checks"]["database"]["down_since"] is not None
+    assert body["degraded_since"] == body["checks"]["database"]["down_since"]
+    assert body["pool"] is None
+
+
+def test_readiness_degraded_and_recovery():
+    health.record_check("database", {"ok": True, "latency_ms": 1.0, "detail": None})
+    health.record_check("elevenlabs", {"ok": False, "latency_ms": 2.0, "detail": "HTTP 503"})
+    status_code, body = health.readiness()
+    assert (status_code, body["status"]) == (200, "degraded")
+    degraded_since = body["degraded_since"]
+    assert degraded_since is not None
+
+    health.record_check("elevenlabs", {"ok": False, "latency_ms": 2.0, "detail": "HTTP 503"})
+    assert health.readiness()[1]["degraded_since"] == degraded_since
+
+    health.record_check("elevenlabs", {"ok": True, "latency_ms": 2.0, "detail": None})
+    status_code, body = health.readiness()
+    assert (status_code, body["status"], body["degraded_since"]) == (200, "healthy", None)
+
+
+def test_readiness_before_first_probe_is_unhealthy():
+    status_code, body = health.readiness()
+    assert status_code == 503
+    assert body["checks"]["database"]["stale"] is True
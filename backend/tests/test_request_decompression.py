@@ -0,0 +1,128 @@
+"""Testes do middleware de descompressão de corpos de request."""
+import asyncio
+import gzip
+import json
+import tracemalloc
+import zlib
+
+import brotli
+import pytest
+import zstandard
+
+from app import request_decompression
+from app.request_decompression import RequestDecompressionMiddleware
+
+LIMIT = 1_000_000
+PAYLOAD = json.dumps(
+    {"entries": [{"level": "log", "message": f"[Conversation] evento {i} " * 4} for i in range(300)]}
+).encode()
+
+ENCODERS = {
+    "gzip": gzip.compress,
+    "deflate": zlib.compress,
+    "br": brotli.compress,
+    "zstd": lambda data: zstandard.ZstdCompressor().compress(data),
+}
+
+
+async def _echo_app(scope, receive, send):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": list(scope["headers"])})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _call(body: bytes, encoding: str, path: str = "/ingest", chunk_size: int = 4096):
+    middleware = RequestDecompressionMiddleware(_echo_app, max_body_bytes=LIMIT, paths=("/ingest",))
+    messages = [
+        {"type": "http.request", "body": body[i:i + chunk_size], "more_body": i + chunk_size < len(body)}
+        for i in range(0, max(len(body), 1), chunk_size)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    headers = [(b"content-encoding", encoding.encode())] if encoding else []
+    asyncio.run(middleware({"type": "http", "path": path, "headers": headers}, receive, send))
+    return sent[0]["status"], dict(sent[0]["headers"]), sent[1]["body"]
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    request_decompression.ingest_stats.clear()
+
+
+@pytest.mark.parametrize("encoding", sorted(ENCODERS))
+def test_each_encoding_round_trips(encoding):
+    status, headers, body = _call(ENCODERS[encoding](PAYLOAD), encoding)
+    assert status == 200
+    assert body == PAYLOAD
+    assert b"content-encoding" not in headers
+    assert headers[b"content-length"] == str(len(PAYLOAD)).encode()
+
+
+def test_identity_passes_through():
+    status, _, body = _call(PAYLOAD, "")
+    assert (status, body) == (200, PAYLOAD)
+
+
+@pytest.mark.parametrize("encoding", sorted(ENCODERS))
+def test_bomb_is_rejected_with_bounded_memory(encoding):
+    bomb = ENCODERS[encoding](b"\0" * 200_000_000)
+    assert len(bomb) < 250_000
+
+    tracemalloc.start()
+    status, _, body = _call(bomb, encoding)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert status == 413
+    assert peak < 4 * LIMIT, f"pico de {peak} bytes"
+
+
+def test_unsupported_and_corrupt_bodies():
+    assert _call(b"data", "compress")[0] == 415
+    assert _call(b"not gzip", "gzip")[0] == 400
+    assert _call(gzip.compress(PAYLOAD)[:-20], "gzip")[0] == 400
+    assert _call(brotli.compress(PAYLOAD)[:-5], "br")[0] == 400
+    assert _call(ENCODERS["zstd"](PAYLOAD)[:-5], "zstd")[0] == 400
+
+
+@pytest.mark.parametrize("chunk_size", [3, 4096])
+def test_concatenated_gzip_members_are_joined(chunk_size):
+    status, _, body = _call(gzip.compress(b'{"a":') + gzip.compress(b"1}"), "gzip", chunk_size=chunk_size)
+    assert (status, body) == (200, b'{"a":1}')
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate", "br", "zstd"])
+def test_trailing_garbage_is_rejected(encoding):
+    assert _call(ENCODERS[encoding](b"{}") + b"garbage", encoding)[0] == 400
+
+
+def test_stats_count_only_accepted_requests():
+    compressed = gzip.compress(PAYLOAD)
+    _call(compressed, "gzip")
+    _call(gzip.compress(b"\0" * 50_000_000), "gzip")
+
+    report = request_decompression.ingest_report()["/ingest"]
+    assert report["requests"] == 1
+    assert report["wire_bytes"] == len(compressed)
+    assert report["body_bytes"] == len(PAYLOAD)
+    assert report["saved_bytes"] > 0
+    assert report["rejected_requests"] == 1
+    assert report["rejected_wire_bytes"] > 0
+
+
+def test_other_paths_are_untouched():
+    compressed = gzip.compress(PAYLOAD)
+    status, headers, body = _call(compressed, "gzip", path="/other")
+    assert (status, body) == (200, compressed)
+    assert headers[b"content-encoding"] == b"gzip"
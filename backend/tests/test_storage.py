@@ -0,0 +1,83 @@
+"""Testes da camada de armazenamento com vários processos escrevendo ao mesmo tempo."""
+import errno
+import multiprocessing
+import os
+from pathlib import Path
+
+from app import storage
+from app.config import settings
+
+WORKERS = 6
+BATCHES = 100
+ENTRIES = 5
+HEADER = "# Browser log session: s1\n# Created at (UTC): 2024-01-01T00:00:00\n\n"
+
+
+def _log_worker(data_dir: str, worker: int) -> None:
+    settings.data_dir = Path(data_dir)
+    for batch in range(BATCHES):
+        body = "".join(
+            f"[2024-01-01T00:{batch % 60:02d}:{entry:02d}.{worker:03d}] [LOG] "
+            f"w{worker} b{batch} e{entry} {'x' * 700}\n"
+            for entry in range(ENTRIES)
+        )
+        storage.append_session_log("s1", HEADER, body)
+
+
+def _file_worker(directory: str, worker: int) -> None:
+    for i in range(BATCHES):
+        storage.write_unique_file(Path(directory), "same_ts_user_0", ".webm", f"w{worker}-{i}".encode() * 500)
+
+
+def _run(target, args_list) -> None:
+    workers = [multiprocessing.Process(target=target, args=args) for args in args_list]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+
+def test_concurrent_session_logs_merge_without_interleaving(data_dir):
+    _run(_log_worker, [(str(data_dir), w) for w in range(WORKERS)])
+
+    merged = storage.read_session_log("s1").splitlines()
+    entries = [line for line in merged if line.startswith("[")]
+
+    assert merged[0] == "# Browser log session: s1"
+    assert len(entries) == WORKERS * BATCHES * ENTRIES
+    assert len(set(entries)) == len(entries)
+    for line in entries:
+        assert line.count("[LOG]") == 1
+        assert line.endswith(" " + "x" * 700)
+    timestamps = [line[1:line.index("]")] for line in entries]
+    assert timestamps == sorted(timestamps)
+
+
+def test_concurrent_unique_files_never_overwrite(tmp_path):
+    _run(_file_worker, [(str(tmp_path), w) for w in range(WORKERS)])
+
+    files = [p for p in tmp_path.iterdir()]
+    assert len(files) == WORKERS * BATCHES
+    assert not [p for p in files if p.name.startswith(".")]
+    contents = {p.read_bytes() for p in files}
+    assert contents == {f"w{w}-{i}".encode() * 500 for w in range(WORKERS) for i in range(BATCHES)}
+
+
+def test_unique_file_skips_reserved_names(tmp_path):
+    path = storage.write_unique_file(tmp_path, "a", ".pcm", b"new", reserved={"a.pcm", "a_1.pcm"})
+    assert path.name == "a_2.pcm"
+    assert path.read_bytes() == b"new"
+
+
+def test_unique_file_without_hard_links(tmp_path, monkeypatch):
+    def no_link(src, dst):
+        raise OSError(errno.EPERM, "hard links not supported")
+
+    monkeypatch.setattr(os, "link", no_link)
+    first = storage.write_unique_file(tmp_path, "a", ".txt", b"one")
+    second = storage.write_unique_file(tmp_path, "a", ".txt", b"two")
+
+    assert (first.name, second.name) == ("a.txt", "a_1.txt")
+    assert (first.read_bytes(), second.read_bytes()) == (b"one", b"two")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.txt", "a_1.txt"]
@@ -9,6 +9,7 @@ import { useConversation } from "@elevenlabs/react";
 import type { LeadData } from "@/app/types/lead";
 import type { MessagePayload } from "@elevenlabs/types";
 import { API_URL } from "@/app/config";
+import { useBatchedPost } from "@/app/hooks/useBatchedPost";
 
 interface Transcript {
   id: string;
@@ -31,6 +32,8 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
   const userAudioEventIdRef = useRef(0);
   const agentAudioEventIdRef = useRef(0);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
+  // Cadeia dos chunks do recorder: mantém a ordem e permite esperar o último
+  const recorderChunksRef = useRef<Promise<void>>(Promise.resolve());
   const userMediaStreamRef = useRef<MediaStream | null>(null);
 
   const firstName = useMemo(() => {
@@ -43,53 +46,47 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
     return `Informações do usuário: Nome completo: ${leadData.nome}, Primeiro nome: ${firstName}, Email: ${leadData.email}, Telefone: ${leadData.telefone}, Empresa: ${leadData.empresa}. Use o primeiro nome para personalizar a conversa.`;
   }, [leadData, firstName]);
 
+  // Transcrições e chunks de áudio vão em lote para /batch (menos requests por conversa)
+  const transcriptBatch = useBatchedPost<Record<string, unknown>>(
+    `${API_URL}/api/transcripts/stt/batch`,
+    { maxItems: 10, maxChars: 64_000, flushMs: 3000 }
+  );
+  const audioBatch = useBatchedPost<Record<string, unknown>>(
+    `${API_URL}/api/transcripts/tts/batch`,
+    { maxItems: 20, maxChars: 2_000_000, flushMs: 2000 }
+  );
+
   const saveTranscript = useCallback(
-    async (speaker: "user" | "agent", text: string) => {
+    (speaker: "user" | "agent", text: string) => {
       if (!text.trim()) {
         return;
       }
-      try {
-        await fetch(`${API_URL}/api/transcripts/stt`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({
-            lead_email: leadData.email,
-            speaker,
-            text,
-            timestamp: new Date().toISOString(),
-          }),
-        });
-      } catch (err) {
-        console.error("[Conversation] erro ao salvar transcrição:", err);
-      }
+      transcriptBatch.enqueue({
+        lead_email: leadData.email,
+        speaker,
+        text,
+        timestamp: new Date().toISOString(),
+      });
     },
-    [leadData.email]
+    [leadData.email, transcriptBatch]
   );
 
   const saveAudio = useCallback(
-    async (speaker: "user" | "agent", audioBase64: string, eventId: number, audioFormat?: string) => {
+    (speaker: "user" | "agent", audioBase64: string, eventId: number, audioFormat?: string) => {
       if (!audioBase64) {
         return;
       }
-      try {
-        await fetch(`${API_URL}/api/transcripts/tts`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({
-            lead_email: leadData.email,
-            lead_id: leadData.id,
-            speaker,
-            audio_base64: audioBase64,
-            event_id: eventId,
-            timestamp: new Date().toISOString(),
-            audio_format: audioFormat,
-          }),
-        });
-      } catch (err) {
-        console.error("[Conversation] erro ao salvar áudio:", err);
-      }
+      audioBatch.enqueue({
+        lead_email: leadData.email,
+        lead_id: leadData.id,
+        speaker,
+        audio_base64: audioBase64,
+        event_id: eventId,
+        timestamp: new Date().toISOString(),
+        audio_format: audioFormat,
+      });
     },
-    [leadData.email, leadData.id]
+    [leadData.email, leadData.id, audioBatch]
   );
 
   const onMessage = useCallback(
@@ -108,7 +105,7 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
           speaker,
         },
       ]);
-      void saveTranscript(speaker, payload.message);
+      saveTranscript(speaker, payload.message);
     },
     [saveTranscript]
   );
@@ -116,7 +113,7 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
   const onAudio = useCallback(
     (base64Audio: string) => {
       agentAudioEventIdRef.current += 1;
-      void saveAudio("agent", base64Audio, agentAudioEventIdRef.current, "pcm");
+      saveAudio("agent", base64Audio, agentAudioEventIdRef.current, "pcm");
     },
     [saveAudio]
   );
@@ -162,13 +159,18 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
     async (stream: MediaStream) => {
       try {
         const recorder = new MediaRecorder(stream, { mimeType: "audio/webm" });
-        recorder.ondataavailable = async (event) => {
-          if (!event.data || event.data.size === 0) {
+        recorder.ondataavailable = (event) => {
+          const data = event.data;
+          if (!data || data.size === 0) {
             return;
           }
-          const base64 = await blobToBase64(event.data);
-          userAudioEventIdRef.current += 1;
-          await saveAudio("user", base64, userAudioEventIdRef.current, "webm");
+          recorderChunksRef.current = recorderChunksRef.current
+            .then(async () => {
+              const base64 = await blobToBase64(data);
+              userAudioEventIdRef.current += 1;
+              saveAudio("user", base64, userAudioEventIdRef.current, "webm");
+            })
+            .catch((err) => console.error("[Conversation] erro ao salvar chunk de áudio do usuário:", err));
         };
         recorder.start(4000);
         mediaRecorderRef.current = recorder;
@@ -179,15 +181,21 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
     [blobToBase64, saveAudio]
   );
 
-  const stopUserAudioCapture = useCallback(() => {
-    if (mediaRecorderRef.current && mediaRecorderRef.current.state !== "inactive") {
-      mediaRecorderRef.current.stop();
+  /** Para a gravação; resolve depois que o último chunk (dataavailable final) foi enfileirado. */
+  const stopUserAudioCapture = useCallback((): Promise<void> => {
+    const recorder = mediaRecorderRef.current;
+    let stopped = Promise.resolve();
+    if (recorder && recorder.state !== "inactive") {
+      // O evento "stop" só dispara depois do último "dataavailable"
+      stopped = new Promise((resolve) => recorder.addEventListener("stop", () => resolve(), { once: true }));
+      recorder.stop();
     }
     mediaRecorderRef.current = null;
     if (userMediaStreamRef.current) {
       userMediaStreamRef.current.getTracks().forEach((track) => track.stop());
     }
     userMediaStreamRef.current = null;
+    return stopped.then(() => recorderChunksRef.current);
   }, []);
 
   const CONNECTION_TIMEOUT_MS = 25_000;
@@ -279,7 +287,7 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
     } catch (err) {
       console.error("[Conversation] falha ao iniciar sessão:", err);
       setErrorMessage("Falha ao iniciar sessão com o agente.");
-      stopUserAudioCapture();
+      void stopUserAudioCapture();
     } finally {
       setIsStarting(false);
     }
@@ -296,10 +304,12 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
     try {
       await conversation.endSession();
     } finally {
-      stopUserAudioCapture();
+      await stopUserAudioCapture();
+      void transcriptBatch.flush();
+      void audioBatch.flush();
       onConversationEnded?.();
     }
-  }, [conversation, onConversationEnded, stopUserAudioCapture]);
+  }, [audioBatch, conversation, onConversationEnded, stopUserAudioCapture, transcriptBatch]);
 
   useEffect(() => {
     if (conversation.status === "connected" && !contextSentRef.current) {
@@ -310,7 +320,8 @@ export function Conversation({ leadData, onConversationEnded }: ConversationProp
 
   useEffect(() => {
     return () => {
-      stopUserAudioCapture();
+      // O último chunk chega depois do unmount; o useBatchedPost o envia na hora
+      void stopUserAudioCapture();
     };
   }, [stopUserAudioCapture]);
 
@@ -0,0 +1,128 @@
+"use client";
+
+import { useCallback, useEffect, useMemo, useRef } from "react";
+import { compressedJsonInit } from "@/app/utils/compressedJson";
+
+interface BatchOptions {
+  /** Envia assim que a fila atinge este número de itens */
+  maxItems: number;
+  /** Envia assim que a fila atinge este tamanho aproximado (caracteres JSON) */
+  maxChars: number;
+  /** Intervalo máximo que um item espera na fila */
+  flushMs: number;
+}
+
+// Navegadores limitam o corpo de requests `keepalive` em voo a 64 KiB no total
+const KEEPALIVE_MAX_CHARS = 60_000;
+
+/**
+ * Envia os itens com `keepalive` (sobrevive ao fechamento da aba), sem compressão:
+ * o fetch precisa sair de forma síncrona no `pagehide`. Divide em lotes abaixo do
+ * limite do keepalive; o que o navegador recusar vai num fetch comum (best effort).
+ */
+function sendWithKeepalive<T>(url: string, items: T[]) {
+  const send = (group: T[]) => {
+    const init: RequestInit = {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ items: group }),
+    };
+    fetch(url, { ...init, keepalive: true })
+      .catch(() => fetch(url, init))
+      .catch((err) => console.error("[useBatchedPost] erro ao enviar lote (keepalive):", err));
+  };
+
+  let group: T[] = [];
+  let groupChars = 0;
+  for (const item of items) {
+    const chars = JSON.stringify(item).length;
+    if (group.length > 0 && groupChars + chars > KEEPALIVE_MAX_CHARS) {
+      send(group);
+      group = [];
+      groupChars = 0;
+    }
+    group.push(item);
+    groupChars += chars;
+  }
+  if (group.length > 0) send(group);
+}
+
+/**
+ * Acumula itens e os envia em lote (`{ items: [...] }`) para um endpoint `/batch`,
+ * reduzindo o número de requests por conversa.
+ *
+ * A fila é esvaziada com `keepalive` quando a aba é escondida ou fechada, e itens
+ * enfileirados depois do unmount (ex.: último chunk do MediaRecorder) são enviados
+ * na hora, sem esperar um intervalo que não existe mais.
+ */
+export function useBatchedPost<T>(url: string, { maxItems, maxChars, flushMs }: BatchOptions) {
+  const queueRef = useRef<T[]>([]);
+  const queuedCharsRef = useRef(0);
+  const sendingRef = useRef<Promise<void>>(Promise.resolve());
+  const unmountedRef = useRef(false);
+
+  const takeQueue = useCallback((): T[] => {
+    const items = queueRef.current;
+    queueRef.current = [];
+    queuedCharsRef.current = 0;
+    return items;
+  }, []);
+
+  const flush = useCallback((): Promise<void> => {
+    if (queueRef.current.length === 0) return sendingRef.current;
+    const items = takeQueue();
+    // Encadeia os envios para preservar a ordem dos lotes
+    sendingRef.current = sendingRef.current.then(async () => {
+      try {
+        await fetch(url, await compressedJsonInit({ items }));
+      } catch (err) {
+        console.error("[useBatchedPost] erro ao enviar lote:", err);
+      }
+    });
+    return sendingRef.current;
+  }, [takeQueue, url]);
+
+  const flushKeepalive = useCallback(() => {
+    if (queueRef.current.length === 0) return;
+    sendWithKeepalive(url, takeQueue());
+  }, [takeQueue, url]);
+
+  const enqueue = useCallback(
+    (item: T) => {
+      queueRef.current.push(item);
+      queuedCharsRef.current += JSON.stringify(item).length;
+      if (
+        unmountedRef.current ||
+        queueRef.current.length >= maxItems ||
+        queuedCharsRef.current >= maxChars
+      ) {
+        void flush();
+      }
+    },
+    [flush, maxItems, maxChars]
+  );
+
+  useEffect(() => {
+    unmountedRef.current = false;
+    const intervalId = window.setInterval(() => void flush(), flushMs);
+    return () => {
+      window.clearInterval(intervalId);
+      unmountedRef.current = true;
+      void flush();
+    };
+  }, [flush, flushMs]);
+
+  useEffect(() => {
+    const onVisibilityChange = () => {
+      if (document.visibilityState === "hidden") flushKeepalive();
+    };
+    window.addEventListener("pagehide", flushKeepalive);
+    document.addEventListener("visibilitychange", onVisibilityChange);
+    return () => {
+      window.removeEventListener("pagehide", flushKeepalive);
+      document.removeEventListener("visibilitychange", onVisibilityChange);
+    };
+  }, [flushKeepalive]);
+
+  return useMemo(() => ({ enqueue, flush }), [enqueue, flush]);
+}
@@ -1,6 +1,7 @@
 "use client";
 
 import { useEffect, useRef } from "react";
+import { compressedJsonInit } from "@/app/utils/compressedJson";
 
 type ConsoleLevel = "log" | "info" | "warn" | "error" | "debug";
 
@@ -64,15 +65,14 @@ export function useBrowserConsoleCapture(
       const batch = queue.splice(0, 200);
       flushing = true;
       try {
-        await fetch(`${apiUrl}/api/debug/browser-logs`, {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({
+        await fetch(
+          `${apiUrl}/api/debug/browser-logs`,
+          await compressedJsonInit({
             session_id: sessionId,
             lead_email: getLeadEmailRef.current(),
             entries: batch,
-          }),
-        });
+          })
+        );
       } catch {
         /* ignore */
       } finally {
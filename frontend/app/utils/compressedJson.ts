@@ -0,0 +1,28 @@
+/**
+ * Monta o corpo JSON de um POST, comprimido com gzip quando vale a pena.
+ * O backend descomprime conforme o header Content-Encoding.
+ */
+
+// Payloads pequenos não compensam o custo de comprimir
+const MIN_COMPRESS_BYTES = 1024;
+
+export async function compressedJsonInit(payload: unknown): Promise<RequestInit> {
+  const json = JSON.stringify(payload);
+  const headers: Record<string, string> = { "Content-Type": "application/json" };
+
+  if (typeof CompressionStream === "undefined" || json.length < MIN_COMPRESS_BYTES) {
+    return { method: "POST", headers, body: json };
+  }
+
+  try {
+    const stream = new Blob([json]).stream().pipeThrough(new CompressionStream("gzip"));
+    const body = await new Response(stream).arrayBuffer();
+    return {
+      method: "POST",
+      headers: { ...headers, "Content-Encoding": "gzip" },
+      body,
+    };
+  } catch {
+    return { method: "POST", headers, body: json };
+  }
+}